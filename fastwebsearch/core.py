@@ -3,10 +3,40 @@ Core functionality for Fast Web Search
 """
 
 import asyncio
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+import logging
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
 from .models import SearchResult
 from .search_engines import SearchEngine
+from .utils import bounded_as_completed
+
+logger = logging.getLogger(__name__)
+
+class _TokenBucket:
+    """
+    Async token bucket shared by all tasks of a FastWebSearch instance
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.interval = 1.0 / rate  # seconds per token
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last: Optional[float] = None
+        self.lock = asyncio.Lock()
+        
+    async def acquire(self):
+        """Wait until a token is available and consume it"""
+        async with self.lock:
+            now = asyncio.get_running_loop().time()
+            if self.last is not None:
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) * self.interval)
+                self.last = asyncio.get_running_loop().time()
+                self.tokens = 0
+            else:
+                self.tokens -= 1
 
 class FastWebSearch:
     """
@@ -24,15 +54,11 @@ class FastWebSearch:
         self.max_concurrent_searches = max_concurrent_searches
         self.rate_limit = rate_limit
         self.semaphore = asyncio.Semaphore(max_concurrent_searches)
-        self.last_request_time = datetime.now()
+        self._bucket = _TokenBucket(rate=rate_limit, capacity=rate_limit)
         
     async def _rate_limit(self):
         """Implement rate limiting"""
-        now = datetime.now()
-        time_since_last = (now - self.last_request_time).total_seconds()
-        if time_since_last < 1.0 / self.rate_limit:
-            await asyncio.sleep(1.0 / self.rate_limit - time_since_last)
-        self.last_request_time = datetime.now()
+        await self._bucket.acquire()
         
     async def search(
         self,
@@ -58,9 +84,30 @@ class FastWebSearch:
                 )
                 return results
             except Exception as e:
-                print(f"Error searching for '{query}': {str(e)}")
+                logger.error("Error searching for '%s': %s", query, e)
                 return []
                 
+    async def multi_search_stream(
+        self,
+        queries: List[str],
+        max_results: int = 10
+    ) -> AsyncIterator[Tuple[str, List[SearchResult]]]:
+        """
+        Perform multiple searches concurrently, yielding results as they finish
+        
+        Args:
+            queries: List of search queries
+            max_results: Maximum number of results per query
+            
+        Yields:
+            (query, results) pairs in completion order
+        """
+        async for query, results in bounded_as_completed(
+            ((query, self.search(query, max_results)) for query in queries),
+            self.max_concurrent_searches
+        ):
+            yield query, results
+            
     async def multi_search(
         self,
         queries: List[str],
@@ -76,14 +123,9 @@ class FastWebSearch:
         Returns:
             Dictionary mapping queries to their results
         """
-        # Create tasks for all queries
-        tasks = []
-        for query in queries:
-            task = asyncio.create_task(self.search(query, max_results))
-            tasks.append(task)
+        results = {}
+        async for query, query_results in self.multi_search_stream(queries, max_results):
+            results[query] = query_results
             
-        # Wait for all tasks to complete
-        results = await asyncio.gather(*tasks)
-        
-        # Map results back to queries
-        return dict(zip(queries, results))
+        # Results stream in completion order; hand them back in query order
+        return {query: results[query] for query in queries if query in results}
@@ -2,7 +2,7 @@
 Data models for Fast Web Search
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Dict, Any
 
@@ -30,6 +30,30 @@ class Proxy:
     password: Optional[str] = None
     last_used: Optional[datetime] = None
     success_rate: float = 0.0
+    url: str = field(init=False, repr=False, compare=False)
+    # Index into ProxyManager.proxy_stats, assigned by the manager
+    id: int = field(default=-1, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Built once so request paths don't reformat it on every call
+        if self.username and self.password:
+            self.url = f"{self.protocol}://{self.username}:{self.password}@{self.host}:{self.port}"
+        else:
+            self.url = f"{self.protocol}://{self.host}:{self.port}"
+
+@dataclass(slots=True)
+class ProxyStats:
+    """
+    Health counters for a single proxy, kept by ProxyManager
+    """
+    success_count: int = 0
+    fail_count: int = 0
+    avg_response_time: float = 0.0
+    last_used: Optional[float] = None
+    last_verified: Optional[float] = None
+    score: float = 0.0
+    heap_seq: Optional[int] = None
+    cooldown_until: Optional[float] = None
 
 @dataclass
 class ScrapeResult:
@@ -37,6 +61,7 @@ class ScrapeResult:
     Represents a scraped webpage result
     """
     url: str
-    content: str
+    content: str = ""
     error: Optional[str] = None
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = field(default_factory=datetime.now)
+    parsed: Optional[Any] = None
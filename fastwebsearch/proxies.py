@@ -4,30 +4,117 @@ Proxy management for Fast Web Search
 
 import random
 import asyncio
+import heapq
+import itertools
+import math
+import time
 import aiohttp
 from typing import List, Optional, Dict
 from datetime import datetime
-from .models import Proxy
+from .models import Proxy, ProxyStats
 
 class ProxyManager:
     """
     Manages proxy rotation and health checking
     """
     
-    def __init__(self, proxies: List[Proxy], verify_timeout: float = 5.0):
+    def __init__(
+        self,
+        proxies: List[Proxy],
+        verify_timeout: float = 5.0,
+        verify_url: str = "http://httpbin.org/ip",
+        cooldown: float = 60.0,
+        min_samples: int = 5
+    ):
         self.proxies = proxies
+        # Proxies not currently cooling down after repeated failures
         self.working_proxies = proxies.copy()
         self.verify_timeout = verify_timeout
-        self.proxy_stats: Dict[Proxy, Dict] = {}
+        self.verify_url = verify_url
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self._verify_session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+        # Stats are indexed by Proxy.id, which is the proxy's position in `proxies`
+        self.proxy_stats: List[ProxyStats] = [ProxyStats() for _ in proxies]
+        for i, proxy in enumerate(proxies):
+            proxy.id = i
+        # Max-heap of (-score, avg_response_time, seq, proxy); entries whose seq
+        # no longer matches the proxy's stats are stale and skipped lazily
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
         for proxy in proxies:
-            self.proxy_stats[proxy] = {
-                "success_count": 0,
-                "fail_count": 0,
-                "avg_response_time": 0.0,
-                "last_used": None,
-                "last_verified": None
-            }
+            self._push(proxy)
+        # Min-heap of (cooldown_until, seq, proxy) for proxies taken out of rotation
+        self._cooling: List[tuple] = []
+            
+    def _push(self, proxy: Proxy):
+        """Recompute a proxy's score and push a fresh heap entry for it"""
+        stats = self.proxy_stats[proxy.id]
+        # Success rate discounted by latency, so fast reliable proxies win. The
+        # rate is smoothed towards 0.5 so an untried proxy outranks one that
+        # has just failed, rather than scoring zero until it is first used
+        success_rate = (stats.success_count + 1) / (stats.success_count + stats.fail_count + 2)
+        stats.score = success_rate * math.exp(-stats.avg_response_time)
+        seq = next(self._seq)
+        stats.heap_seq = seq
+        heapq.heappush(self._heap, (-stats.score, stats.avg_response_time, seq, proxy))
+        
+    def _pop(self) -> Optional[Proxy]:
+        """Pop the best-scoring working proxy, discarding stale entries"""
+        while self._heap:
+            _, _, seq, proxy = heapq.heappop(self._heap)
+            stats = self.proxy_stats[proxy.id]
+            if stats.heap_seq == seq:
+                stats.heap_seq = None
+                return proxy
+        return None
+        
+    def _cool_down(self, proxy: Proxy):
+        """Take a proxy out of rotation until its cooldown expires"""
+        stats = self.proxy_stats[proxy.id]
+        if stats.cooldown_until is not None:
+            return
+        stats.cooldown_until = time.monotonic() + self.cooldown
+        stats.heap_seq = None
+        self.working_proxies = [p for p in self.working_proxies if p is not proxy]
+        heapq.heappush(self._cooling, (stats.cooldown_until, next(self._seq), proxy))
+        
+    def _release_cooled(self):
+        """Return proxies whose cooldown has expired to the rotation"""
+        now = time.monotonic()
+        while self._cooling and self._cooling[0][0] <= now:
+            until, _, proxy = heapq.heappop(self._cooling)
+            stats = self.proxy_stats[proxy.id]
+            if stats.cooldown_until == until:
+                # Counters are kept, so a proxy that fails again cools straight away
+                stats.cooldown_until = None
+                self.working_proxies.append(proxy)
+                self._push(proxy)
+                
+    def _rebuild_heap(self):
+        """Rebuild the heap from the current working proxies"""
+        self._heap = []
+        for stats in self.proxy_stats:
+            stats.heap_seq = None
+        for proxy in self.working_proxies:
+            self._push(proxy)
+        
+    async def _session(self) -> aiohttp.ClientSession:
+        """Get or create the session shared by all proxy verifications"""
+        async with self._session_lock:
+            if self._verify_session is None or self._verify_session.closed:
+                self._verify_session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=50, ssl=False),
+                    timeout=aiohttp.ClientTimeout(total=self.verify_timeout)
+                )
+        return self._verify_session
         
+    async def aclose(self):
+        """Close the verification session"""
+        if self._verify_session and not self._verify_session.closed:
+            await self._verify_session.close()
+            
     async def verify_proxy(self, proxy: Proxy) -> bool:
         """
         Verify if a proxy is working by making a test request
@@ -38,77 +125,86 @@ class ProxyManager:
         Returns:
             bool: True if proxy is working, False otherwise
         """
-        proxy_url = f"{proxy.protocol}://{proxy.host}:{proxy.port}"
-        if proxy.username and proxy.password:
-            proxy_url = f"{proxy.protocol}://{proxy.username}:{proxy.password}@{proxy.host}:{proxy.port}"
+        proxy_url = proxy.url
             
         try:
-            start_time = datetime.now()
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://www.google.com",
-                    proxy=proxy_url,
-                    timeout=self.verify_timeout
-                ) as response:
-                    if response.status == 200:
-                        end_time = datetime.now()
-                        response_time = (end_time - start_time).total_seconds()
-                        
-                        # Update proxy stats
-                        stats = self.proxy_stats[proxy]
-                        stats["success_count"] += 1
-                        stats["avg_response_time"] = (
-                            (stats["avg_response_time"] * (stats["success_count"] - 1) + response_time)
-                            / stats["success_count"]
-                        )
-                        stats["last_verified"] = datetime.now()
-                        return True
+            session = await self._session()
+            start_time = time.monotonic()
+            # HEAD against a lightweight endpoint so no page body is transferred
+            async with session.head(self.verify_url, proxy=proxy_url) as response:
+                if response.status == 200:
+                    response_time = time.monotonic() - start_time
+                    
+                    # Update proxy stats
+                    stats = self.proxy_stats[proxy.id]
+                    stats.success_count += 1
+                    stats.avg_response_time = (
+                        (stats.avg_response_time * (stats.success_count - 1) + response_time)
+                        / stats.success_count
+                    )
+                    stats.last_verified = time.monotonic()
+                    self._push(proxy)
+                    return True
         except Exception as e:
-            stats = self.proxy_stats[proxy]
-            stats["fail_count"] += 1
+            stats = self.proxy_stats[proxy.id]
+            stats.fail_count += 1
+            self._push(proxy)
             return False
             
+        self._push(proxy)
         return False
         
-    async def get_proxy(self) -> Optional[Proxy]:
+    async def get_proxy(self, verify: bool = True) -> Optional[Proxy]:
         """
         Get a working proxy from the pool
         
+        Args:
+            verify: Probe candidates before returning them. When False, the
+                best-scoring proxy is returned directly and the caller is
+                expected to report the outcome via mark_proxy_success/failed
+        
         Returns:
             A proxy object or None if no working proxies available
         """
+        self._release_cooled()
         if not self.working_proxies:
             return None
             
-        # Sort proxies by success rate and response time
-        sorted_proxies = sorted(
-            self.working_proxies,
-            key=lambda p: (
-                self.proxy_stats[p]["success_count"] / (self.proxy_stats[p]["success_count"] + self.proxy_stats[p]["fail_count"] + 1),
-                -self.proxy_stats[p]["avg_response_time"]  # Negative for descending order
-            ),
-            reverse=True
-        )
-        
-        # Try the best proxies first
-        for proxy in sorted_proxies[:3]:  # Try top 3 proxies
+        if not verify:
+            proxy = self._pop()
+            if proxy is not None:
+                # Re-pushed with a newer seq, so equally scored proxies rotate
+                self._push(proxy)
+                proxy.last_used = datetime.now()
+                self.proxy_stats[proxy.id].last_used = time.monotonic()
+                return proxy
+                
+        # Try the best proxies first, by success rate then response time;
+        # verify_proxy pushes each candidate back with its updated score
+        for _ in range(3):  # Try top 3 proxies
+            proxy = self._pop()
+            if proxy is None:
+                break
             if await self.verify_proxy(proxy):
                 proxy.last_used = datetime.now()
+                self.proxy_stats[proxy.id].last_used = time.monotonic()
                 return proxy
                 
         # If no working proxies found, try to verify all proxies
-        tasks = [self.verify_proxy(proxy) for proxy in self.working_proxies]
+        candidates = list(self.working_proxies)
+        tasks = [self.verify_proxy(proxy) for proxy in candidates]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # Update working proxies list
-        self.working_proxies = [
-            proxy for proxy, is_working in zip(self.working_proxies, results)
-            if isinstance(is_working, bool) and is_working
-        ]
+        # Proxies that failed verification cool down rather than being dropped
+        for proxy, is_working in zip(candidates, results):
+            if not (isinstance(is_working, bool) and is_working):
+                self._cool_down(proxy)
+        self._rebuild_heap()
         
         if self.working_proxies:
             proxy = self.working_proxies[0]
             proxy.last_used = datetime.now()
+            self.proxy_stats[proxy.id].last_used = time.monotonic()
             return proxy
             
         return None
@@ -117,22 +213,35 @@ class ProxyManager:
         """
         Mark a proxy as failed and adjust its success rate
         
+        Once a proxy has at least min_samples outcomes and a success rate
+        below 0.5, it is taken out of rotation for the cooldown period.
+        
         Args:
             proxy: The failed proxy
         """
-        stats = self.proxy_stats[proxy]
-        stats["fail_count"] += 1
-        success_rate = stats["success_count"] / (stats["success_count"] + stats["fail_count"])
+        stats = self.proxy_stats[proxy.id]
+        stats.fail_count += 1
+        samples = stats.success_count + stats.fail_count
         
-        if success_rate < 0.5:
-            self.working_proxies.remove(proxy)
+        if samples >= self.min_samples and stats.success_count / samples < 0.5:
+            self._cool_down(proxy)
+        elif stats.heap_seq is not None:
+            self._push(proxy)
             
-    async def mark_proxy_success(self, proxy: Proxy):
+    async def mark_proxy_success(self, proxy: Proxy, response_time: Optional[float] = None):
         """
         Mark a proxy as successful and adjust its success rate
         
         Args:
             proxy: The successful proxy
+            response_time: Optional observed response time in seconds
         """
-        stats = self.proxy_stats[proxy]
-        stats["success_count"] += 1
+        stats = self.proxy_stats[proxy.id]
+        stats.success_count += 1
+        if response_time is not None:
+            stats.avg_response_time = (
+                (stats.avg_response_time * (stats.success_count - 1) + response_time)
+                / stats.success_count
+            )
+        if stats.heap_seq is not None:
+            self._push(proxy)
@@ -1,15 +1,130 @@
 import asyncio
+import codecs
+import logging
+import os
+import time
 import aiohttp
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urlparse
 import urllib.robotparser
-from typing import List, Optional, Dict
-from itertools import cycle
+from typing import Any, Callable, List, Optional, Dict
 from .models import ScrapeResult, Proxy
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from .proxies import ProxyManager
+from .utils import bounded_gather
+from selectolax.lexbor import LexborHTMLParser
 
-# Cache for robots.txt parsers per domain
-_robot_parsers = {}
+logger = logging.getLogger(__name__)
+
+# LRU cache of robots.txt parsers per domain, stamped with time.monotonic();
+# a None parser means robots.txt could not be read and everything is allowed
+_robot_parsers: "OrderedDict[str, tuple[Optional[urllib.robotparser.RobotFileParser], float]]" = OrderedDict()
+_ROBOTS_TTL = 86400
+_ROBOTS_CACHE_MAX = 1024
+# robots.txt bodies are truncated here, the same 500 KiB limit major crawlers apply
+_ROBOTS_MAX_BYTES = 500 * 1024
+
+# Pages are truncated at this many bytes rather than read whole into memory
+MAX_CONTENT_BYTES = 4 * 1024 * 1024
+_READ_CHUNK_SIZE = 65536
+
+# Sessions shared by scrape_urls so connections are kept alive across calls. A
+# session and its lock are bound to the loop that created them, so both are kept
+# per loop, keyed by id(loop). Call aclose() before a loop ends to close its
+# session cleanly; entries of loops closed without it are dropped on next use
+_SESSIONS: Dict[int, aiohttp.ClientSession] = {}
+_SESSION_LOCKS: Dict[int, "tuple[asyncio.AbstractEventLoop, asyncio.Lock]"] = {}
+
+# Worker processes for CPU-bound parsing of scraped pages, created on first use
+_PROC_POOL: Optional[ProcessPoolExecutor] = None
+
+def _prune_closed_loops():
+    """
+    Forget the sessions and locks of loops that were closed without aclose().
+    """
+    for key, (loop, _) in list(_SESSION_LOCKS.items()):
+        if loop.is_closed():
+            del _SESSION_LOCKS[key]
+            _SESSIONS.pop(key, None)
+
+def _session_lock(loop: asyncio.AbstractEventLoop) -> asyncio.Lock:
+    """
+    Get or lazily create the session lock for the given loop.
+    """
+    _prune_closed_loops()
+    entry = _SESSION_LOCKS.get(id(loop))
+    if entry is None or entry[0] is not loop:
+        _SESSIONS.pop(id(loop), None)
+        entry = _SESSION_LOCKS[id(loop)] = (loop, asyncio.Lock())
+    return entry[1]
+
+async def get_session() -> aiohttp.ClientSession:
+    """
+    Get or lazily create the shared aiohttp session for the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    async with _session_lock(loop):
+        session = _SESSIONS.get(id(loop))
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=200,
+                limit_per_host=10,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True
+            )
+            session = _SESSIONS[id(loop)] = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30, sock_connect=5)
+            )
+    return session
+
+def _get_proc_pool() -> ProcessPoolExecutor:
+    """
+    Get or lazily create the process pool used for parsing.
+    """
+    global _PROC_POOL
+    if _PROC_POOL is None:
+        _PROC_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _PROC_POOL
+
+async def aclose():
+    """
+    Close the running loop's scraping session and the parse pool, if they were created.
+
+    Call this before the event loop ends; a session left open when its loop
+    closes can no longer be closed cleanly.
+    """
+    global _PROC_POOL
+    loop = asyncio.get_running_loop()
+    async with _session_lock(loop):
+        session = _SESSIONS.pop(id(loop), None)
+        if session is not None and not session.closed:
+            await session.close()
+    if _PROC_POOL is not None:
+        _PROC_POOL.shutdown(wait=False, cancel_futures=True)
+        _PROC_POOL = None
+
+def _cached_robot_parser(base_url: str):
+    """
+    Return the cached (parser, timestamp) entry for a domain, or None if missing or expired.
+    """
+    entry = _robot_parsers.get(base_url)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[1] > _ROBOTS_TTL:
+        del _robot_parsers[base_url]
+        return None
+    _robot_parsers.move_to_end(base_url)
+    return entry
+
+def _store_robot_parser(base_url: str, rp: Optional[urllib.robotparser.RobotFileParser]):
+    """
+    Cache a domain's robots.txt parser, evicting the least recently used domain.
+    """
+    _robot_parsers[base_url] = (rp, time.monotonic())
+    _robot_parsers.move_to_end(base_url)
+    if len(_robot_parsers) > _ROBOTS_CACHE_MAX:
+        _robot_parsers.popitem(last=False)
 
 def allowed_by_robots(url: str, user_agent: str = "fast-web-search") -> bool:
     """
@@ -17,7 +132,8 @@ def allowed_by_robots(url: str, user_agent: str = "fast-web-search") -> bool:
     """
     parsed = urlparse(url)
     base_url = f"{parsed.scheme}://{parsed.netloc}"
-    if base_url not in _robot_parsers:
+    cached = _cached_robot_parser(base_url)
+    if cached is None:
         robots_url = f"{base_url}/robots.txt"
         rp = urllib.robotparser.RobotFileParser()
         rp.set_url(robots_url)
@@ -26,71 +142,222 @@ def allowed_by_robots(url: str, user_agent: str = "fast-web-search") -> bool:
         except Exception as e:
             # In case of failure reading robots.txt, assume allowed
             rp = None
-        _robot_parsers[base_url] = rp
-    rp = _robot_parsers.get(base_url)
+        _store_robot_parser(base_url, rp)
+    else:
+        rp = cached[0]
+    if rp:
+        return rp.can_fetch(user_agent, url)
+    return True
+
+async def allowed_by_robots_async(session: aiohttp.ClientSession, url: str, user_agent: str = "fast-web-search", proxy_url: Optional[str] = None) -> bool:
+    """
+    Check robots.txt like allowed_by_robots, fetching it through an aiohttp session.
+
+    Pass proxy_url to fetch robots.txt through the same proxy as the page, so
+    the target host never sees a direct request.
+    """
+    parsed = urlparse(url)
+    base_url = f"{parsed.scheme}://{parsed.netloc}"
+    cached = _cached_robot_parser(base_url)
+    if cached is None:
+        rp = urllib.robotparser.RobotFileParser()
+        try:
+            async with session.get(f"{base_url}/robots.txt", proxy=proxy_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status in (401, 403):
+                    # Same convention as RobotFileParser.read()
+                    rp.disallow_all = True
+                else:
+                    text = await _read_text(response, _ROBOTS_MAX_BYTES) if response.status == 200 else ""
+                    rp.parse(text.splitlines())
+        except Exception as e:
+            # In case of failure reading robots.txt, assume allowed
+            rp = None
+        _store_robot_parser(base_url, rp)
+    else:
+        rp = cached[0]
     if rp:
         return rp.can_fetch(user_agent, url)
     return True
 
-async def fetch(session: aiohttp.ClientSession, url: str, proxy_cycle: cycle, user_agent: str = "fast-web-search", max_retries: int = 3) -> ScrapeResult:
+def _is_text_response(response: aiohttp.ClientResponse) -> bool:
+    """
+    Check whether a response declares a textual content type worth reading.
+    """
+    # Only a missing header is given the benefit of the doubt; aiohttp reports
+    # it as application/octet-stream, which a declared binary body also uses
+    if "Content-Type" not in response.headers:
+        return True
+    content_type = response.content_type
+    return content_type.startswith("text/") or content_type == "application/xhtml+xml"
+
+async def _read_text(response: aiohttp.ClientResponse, max_bytes: int = MAX_CONTENT_BYTES) -> str:
+    """
+    Read and decode a response body, stopping once max_bytes have been read.
+    """
+    buf = bytearray()
+    async for chunk in response.content.iter_chunked(_READ_CHUNK_SIZE):
+        buf.extend(chunk)
+        if len(buf) >= max_bytes:
+            del buf[max_bytes:]
+            break
+    charset = response.charset or "utf-8"
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        charset = "utf-8"
+    return buf.decode(charset, errors="replace")
+
+# Statuses a forward proxy answers with when it, not the target, is failing
+_PROXY_ERROR_STATUSES = frozenset({407, 502, 503, 504})
+
+class _ProxyStatusError(aiohttp.ClientError):
+    """Raised inside fetch when a proxied request gets a proxy error status"""
+
+async def fetch(session: aiohttp.ClientSession, url: str, proxy_manager: Optional[ProxyManager] = None, user_agent: str = "fast-web-search", max_retries: int = 3, parse: Optional[Callable[[str], Any]] = None, timeout: float = 5) -> ScrapeResult:
     """
     Asynchronously fetch the content of a URL using retries, backoff and robots.txt checking.
+
+    Each attempt uses the best-scoring proxy from proxy_manager and reports
+    successes and proxy errors back to it; without a proxy manager the URL is
+    fetched directly. Proxy connection errors, timeouts and proxy error
+    statuses (407/502/503/504) count against the proxy and are retried.
+    If parse is given, it runs on the content in a worker process and its
+    return value is stored in ScrapeResult.parsed.
     """
-    # Check robots.txt using a thread to avoid blocking the event loop.
-    allowed = await asyncio.to_thread(allowed_by_robots, url, user_agent)
+    # robots.txt goes through a proxy too when one is in use
+    robots_proxy_url = None
+    if proxy_manager is not None:
+        robots_proxy = await proxy_manager.get_proxy(verify=False)
+        if robots_proxy is None:
+            return ScrapeResult(url=url, error="No working proxies available")
+        robots_proxy_url = robots_proxy.url
+    allowed = await allowed_by_robots_async(session, url, user_agent, robots_proxy_url)
     if not allowed:
         return ScrapeResult(url=url, error="Disallowed by robots.txt")
 
     backoff = 1
     for attempt in range(max_retries):
-        proxy = next(proxy_cycle)
+        proxy = None
+        if proxy_manager is not None:
+            proxy = await proxy_manager.get_proxy(verify=False)
+            if proxy is None:
+                return ScrapeResult(url=url, error="No working proxies available")
+        proxy_url = proxy.url if proxy else None
         try:
-            async with session.get(url, proxy=proxy, timeout=5) as response:
-                text = await response.text()
-                return ScrapeResult(url=url, content=text)
+            start_time = time.monotonic()
+            async with session.get(url, proxy=proxy_url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response_time = time.monotonic() - start_time
+                if proxy is not None and response.status in _PROXY_ERROR_STATUSES:
+                    raise _ProxyStatusError(f"HTTP {response.status} from proxy")
+                # Non-200 and non-text responses are reported without reading the body
+                if response.status != 200:
+                    result = ScrapeResult(url=url, error=f"HTTP {response.status}")
+                elif not _is_text_response(response):
+                    result = ScrapeResult(url=url, error=f"Unsupported content type: {response.headers.get('Content-Type')}")
+                else:
+                    result = ScrapeResult(url=url, content=await _read_text(response))
+            if proxy is not None:
+                await proxy_manager.mark_proxy_success(proxy, response_time)
         except Exception as e:
-            print(f"Attempt {attempt+1}: Error fetching {url} with proxy {proxy}: {e}")
+            # Only failures attributable to the proxy count against it; target-side
+            # errors such as disconnects or decode errors say nothing about it.
+            # A timeout does, since a hung proxy would otherwise keep its score
+            if proxy is not None and isinstance(e, (
+                aiohttp.ClientProxyConnectionError,
+                aiohttp.ClientHttpProxyError,
+                _ProxyStatusError,
+                asyncio.TimeoutError
+            )):
+                await proxy_manager.mark_proxy_failed(proxy)
+            # Log the proxy host only so credentials never reach the logs
+            logger.warning(
+                "Attempt %d: error fetching %s via proxy %s: %s",
+                attempt + 1, url, proxy.host if proxy else None, e
+            )
             await asyncio.sleep(backoff)
             backoff *= 2  # exponential backoff
+            continue
+
+        if parse is not None and result.error is None:
+            loop = asyncio.get_running_loop()
+            try:
+                result.parsed = await loop.run_in_executor(_get_proc_pool(), parse, result.content)
+            except Exception as e:
+                result.error = f"Failed to parse content: {e}"
+        return result
     return ScrapeResult(url=url, error="Failed after retries")
 
-async def scrape_urls(urls: List[str], proxy_cycle: cycle, user_agent: str = "fast-web-search", max_retries: int = 3) -> List[ScrapeResult]:
+async def scrape_urls(urls: List[str], proxy_manager: Optional[ProxyManager] = None, user_agent: str = "fast-web-search", max_retries: int = 3, session: Optional[aiohttp.ClientSession] = None, max_concurrency: int = 50, parse: Optional[Callable[[str], Any]] = None, timeout: float = 5) -> List[ScrapeResult]:
     """
-    Asynchronously scrape multiple URLs.
+    Asynchronously scrape multiple URLs, at most max_concurrency at a time.
+
+    Uses the shared module session unless an explicit session is given.
+    parse, if given, must be picklable (e.g. a module-level function such as
+    extract_text); it runs in a process pool so parsing uses all cores while
+    other fetches continue.
     """
-    tasks = []
-    connector = aiohttp.TCPConnector(limit_per_host=10)
-    async with aiohttp.ClientSession(connector=connector) as session:
-        for url in urls:
-            tasks.append(fetch(session, url, proxy_cycle, user_agent, max_retries))
-        results = await asyncio.gather(*tasks)
+    if session is None:
+        session = await get_session()
+    results = await bounded_gather(
+        (fetch(session, url, proxy_manager, user_agent, max_retries, parse, timeout) for url in urls),
+        max_concurrency
+    )
     return results
 
+def extract_text(html: str) -> str:
+    """
+    Extract the visible body text of an HTML document.
+    """
+    body = LexborHTMLParser(html).body
+    return body.text(separator=" ") if body else ""
+
 class WebScraper:
     """
     Handles web scraping operations with connection pooling and caching
     """
     
-    def __init__(self, cache_ttl: int = 3600, max_connections: int = 10):
-        self.session = None
-        self.cache: Dict[str, tuple[str, datetime]] = {}
+    def __init__(
+        self,
+        cache_ttl: int = 3600,
+        max_connections: int = 10,
+        session: Optional[aiohttp.ClientSession] = None,
+        cache_max: int = 10_000
+    ):
+        # An injected session is owned by the caller and is never closed here
+        self.session = session
+        self._owns_session = session is None
+        # LRU ordered from least to most recently used, stamped with time.monotonic()
+        self.cache: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
         self.cache_ttl = cache_ttl
+        self.cache_max = cache_max
         self.max_connections = max_connections
         self.semaphore = asyncio.Semaphore(max_connections)
         
-    async def __aenter__(self):
-        timeout = aiohttp.ClientTimeout(total=30)
-        self.session = aiohttp.ClientSession(
-            timeout=timeout,
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a session with a keep-alive connector sized to max_connections"""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30, sock_connect=5),
             headers={
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
             }
         )
+        
+    async def __aenter__(self):
+        if self.session is None or self.session.closed:
+            self.session = self._create_session()
+            self._owns_session = True
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
+            self.session = None
             
     async def get_page_content(
         self,
@@ -110,33 +377,36 @@ class WebScraper:
             Parsed HTML content
         """
         # Check cache first
-        if use_cache and url in self.cache:
-            content, timestamp = self.cache[url]
-            if datetime.now() - timestamp < timedelta(seconds=self.cache_ttl):
-                return content
+        if use_cache:
+            entry = self.cache.get(url)
+            if entry is not None:
+                if time.monotonic() - entry[1] < self.cache_ttl:
+                    self.cache.move_to_end(url)
+                    return entry[0]
+                del self.cache[url]
                 
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        if self.session is None or self.session.closed:
+            self.session = self._create_session()
+            self._owns_session = True
             
-        proxy_url = None
-        if proxy:
-            proxy_url = f"{proxy.protocol}://{proxy.host}:{proxy.port}"
-            if proxy.username and proxy.password:
-                proxy_url = f"{proxy.protocol}://{proxy.username}:{proxy.password}@{proxy.host}:{proxy.port}"
+        proxy_url = proxy.url if proxy else None
                 
         async with self.semaphore:  # Limit concurrent connections
             try:
-                async with self.session.get(url, proxy=proxy_url) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
-                        content = soup.get_text()
-                        
-                        # Cache the result
-                        self.cache[url] = (content, datetime.now())
-                        return content
-                    else:
-                        raise aiohttp.ClientError(f"HTTP {response.status}")
+                async with self.session.get(url, proxy=proxy_url, raise_for_status=True) as response:
+                    if not _is_text_response(response):
+                        raise aiohttp.ClientError(f"Unsupported content type: {response.headers.get('Content-Type')}")
+                    html = await _read_text(response)
+                    
+                # Parse off the event loop so other fetches keep progressing
+                content = await asyncio.to_thread(extract_text, html)
+                
+                # Cache the result
+                self.cache[url] = (content, time.monotonic())
+                self.cache.move_to_end(url)
+                if len(self.cache) > self.cache_max:
+                    self.cache.popitem(last=False)
+                return content
             except Exception as e:
                 raise aiohttp.ClientError(f"Failed to fetch {url}: {str(e)}")
                 
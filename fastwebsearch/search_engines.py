@@ -3,12 +3,17 @@ Search engine implementations for Fast Web Search
 """
 
 from abc import ABC, abstractmethod
+import asyncio
+import logging
 import aiohttp
-import json
+import orjson
+import yarl
 from typing import List, Optional, Dict
 from datetime import datetime
 from .models import SearchResult, Proxy
 
+logger = logging.getLogger(__name__)
+
 class SearchEngine(ABC):
     """
     Abstract base class for search engines
@@ -42,13 +47,28 @@ class BraveSearchEngine(SearchEngine):
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.search.brave.com/res/v1/web/search"
+        # Static query parameters are baked in once; search() only adds q and count
+        self._base = yarl.URL(self.base_url).update_query(
+            search_lang="en",
+            result_filter="web",
+            text_format="plain"
+        )
+        # Request headers never change for a given API key, so build them once
+        self._headers = {
+            "Accept": "application/json",
+            "X-Subscription-Token": api_key
+        }
         self._session = None
+        self._session_lock = asyncio.Lock()
         
-    @property
-    def session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session"""
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get or create aiohttp session, guarded against concurrent creation"""
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit_per_host=4, ttl_dns_cache=300),
+                    json_serialize=lambda obj: orjson.dumps(obj).decode()
+                )
         return self._session
         
     async def close(self):
@@ -65,71 +85,57 @@ class BraveSearchEngine(SearchEngine):
         """
         Perform a search using Brave Search API
         """
-        headers = {
-            "Accept": "application/json",
-            "X-Subscription-Token": self.api_key
-        }
-        
-        params = {
-            "q": query,
-            "count": max_results,
-            "search_lang": "en",
-            "result_filter": "web",
-            "text_format": "plain"
-        }
+        url = self._base.update_query(q=query, count=max_results)
         
-        proxy_url = None
-        if proxy:
-            proxy_url = f"{proxy.protocol}://{proxy.host}:{proxy.port}"
-            if proxy.username and proxy.password:
-                proxy_url = f"{proxy.protocol}://{proxy.username}:{proxy.password}@{proxy.host}:{proxy.port}"
+        proxy_url = proxy.url if proxy else None
                 
+        session = await self._get_session()
         try:
-            async with self.session.get(
-                self.base_url,
-                headers=headers,
-                params=params,
+            async with session.get(
+                url,
+                headers=self._headers,
                 proxy=proxy_url,
                 timeout=30
             ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    results = []
+                if response.status >= 400:
+                    # Only the error path reads the body as text, for Brave's diagnostics
+                    error_text = await response.text()
+                    logger.error("API error for query '%s': status %s: %s", query, response.status, error_text)
+                    raise aiohttp.ClientError(f"Brave API error: {response.status} - {error_text}")
                     
-                    # Debug print
-                    print(f"\nAPI Response for '{query}':")
-                    print(json.dumps(data, indent=2))
+                data = orjson.loads(await response.read())
+                results = []
+                
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Brave response for '%s': %s", query, data)
+                
+                web_results = data.get("web", {}).get("results", [])
+                if not web_results:
+                    logger.info("No results found for query: %s", query)
+                    return []
                     
-                    web_results = data.get("web", {}).get("results", [])
-                    if not web_results:
-                        print(f"No results found for query: {query}")
-                        return []
+                # One timestamp for the whole response batch
+                now = datetime.now()
+                for web_result in web_results:
+                    try:
+                        result = SearchResult(
+                            title=web_result.get("title", ""),
+                            url=web_result.get("url", ""),
+                            snippet=web_result.get("description", ""),
+                            timestamp=now,
+                            source="brave",
+                            metadata={
+                                "age": web_result.get("age", ""),
+                                "language": web_result.get("language", ""),
+                                "family_friendly": web_result.get("family_friendly", False)
+                            }
+                        )
+                        results.append(result)
+                    except Exception as e:
+                        logger.warning("Error processing result for query '%s': %s", query, e)
+                        continue
                         
-                    for web_result in web_results:
-                        try:
-                            result = SearchResult(
-                                title=web_result.get("title", ""),
-                                url=web_result.get("url", ""),
-                                snippet=web_result.get("description", ""),
-                                timestamp=datetime.now(),
-                                source="brave",
-                                metadata={
-                                    "age": web_result.get("age", ""),
-                                    "language": web_result.get("language", ""),
-                                    "family_friendly": web_result.get("family_friendly", False)
-                                }
-                            )
-                            results.append(result)
-                        except Exception as e:
-                            print(f"Error processing result for query '{query}': {e}")
-                            continue
-                            
-                    return results
-                else:
-                    error_text = await response.text()
-                    print(f"API Error for query '{query}': Status {response.status}")
-                    print(f"Response: {error_text}")
-                    raise aiohttp.ClientError(f"Brave API error: {response.status} - {error_text}")
+                return results
         except Exception as e:
-            print(f"Exception during search for '{query}': {str(e)}")
+            logger.error("Exception during search for '%s': %s", query, e)
             raise aiohttp.ClientError(f"Failed to search with Brave: {str(e)}")
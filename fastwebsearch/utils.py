@@ -0,0 +1,115 @@
+"""
+Async helpers for Fast Web Search
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Hashable, Iterable, List, Tuple
+
+async def bounded_gather(aws: Iterable[Awaitable[Any]], limit: int) -> List[Any]:
+    """
+    Run awaitables with at most `limit` in flight, like asyncio.gather
+    
+    Awaitables are pulled from the iterable only as slots free up, so a
+    generator keeps memory proportional to `limit` rather than the input.
+    
+    Args:
+        aws: Iterable of awaitables
+        limit: Maximum number of awaitables running at once
+        
+    Returns:
+        List of results in input order
+        
+    Raises:
+        ValueError: If limit is less than 1
+    """
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    results: List[Any] = []
+    pending = {}
+    iterator = iter(aws)
+    exhausted = False
+    
+    try:
+        while True:
+            while not exhausted and len(pending) < limit:
+                try:
+                    aw = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                results.append(None)
+                pending[asyncio.ensure_future(aw)] = len(results) - 1
+                
+            if not pending:
+                return results
+                
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Retrieve every finished task's outcome before raising, so no
+            # exception is left unretrieved
+            error = None
+            for task in done:
+                index = pending.pop(task)
+                if task.cancelled():
+                    error = error or asyncio.CancelledError()
+                elif task.exception() is not None:
+                    error = error or task.exception()
+                else:
+                    results[index] = task.result()
+            if error is not None:
+                raise error
+    finally:
+        # Runs on error or when the caller itself is cancelled, since
+        # asyncio.wait leaves the tasks it waits on running
+        for task in pending:
+            task.cancel()
+
+async def bounded_as_completed(
+    keyed_aws: Iterable[Tuple[Hashable, Awaitable[Any]]],
+    limit: int
+) -> AsyncIterator[Tuple[Hashable, Any]]:
+    """
+    Yield (key, result) pairs as awaitables finish, with at most `limit` in flight
+    
+    Like bounded_gather, but results stream out in completion order so the
+    first ones are available before the slowest awaitable finishes.
+    
+    Args:
+        keyed_aws: Iterable of (key, awaitable) pairs
+        limit: Maximum number of awaitables running at once
+        
+    Yields:
+        (key, result) for each awaitable, in completion order
+        
+    Raises:
+        ValueError: If limit is less than 1
+    """
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    pending = {}
+    iterator = iter(keyed_aws)
+    exhausted = False
+    
+    try:
+        while True:
+            while not exhausted and len(pending) < limit:
+                try:
+                    key, aw = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(aw)] = key
+                
+            if not pending:
+                return
+                
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield pending.pop(task), task.result()
+    finally:
+        # Runs on error or when the consumer stops iterating early; finished
+        # tasks still have their exceptions retrieved so none go unreported
+        for task in pending:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()
@@ -8,9 +8,11 @@ setup(
     packages=find_packages(),
     install_requires=[
         "requests==2.31.0",
-        "beautifulsoup4==4.12.2",
         "aiohttp",
+        "yarl",
+        "orjson",
+        "selectolax",
         "pydantic",
     ],
-    python_requires=">=3.7",
+    python_requires=">=3.10",
 )
@@ -1,7 +1,7 @@
 import asyncio
 import os
+import time
 from fastwebsearch import FastWebSearch, BraveSearchEngine
-from datetime import datetime
 
 async def main():
     # Initialize the Brave search engine with your API key
@@ -25,7 +25,7 @@ async def main():
         ]
         
         # Measure execution time
-        start_time = datetime.now()
+        start_time = time.monotonic()
         
         # Perform concurrent searches
         results = await fws.multi_search(
@@ -33,8 +33,7 @@ async def main():
             max_results=10
         )
         
-        end_time = datetime.now()
-        execution_time = (end_time - start_time).total_seconds()
+        execution_time = time.monotonic() - start_time
         
         # Print results
         print(f"\nExecution time: {execution_time:.2f} seconds")
@@ -0,0 +1,32 @@
+"""
+Tests for FastWebSearch
+"""
+
+import asyncio
+import pytest
+from fastwebsearch import FastWebSearch, SearchEngine
+
+class _DelayedEngine(SearchEngine):
+    """Returns the query as its only result after a per-query delay"""
+    
+    def __init__(self, delays):
+        self.delays = delays
+        
+    async def search(self, query, max_results=10, proxy=None):
+        await asyncio.sleep(self.delays[query])
+        return [query]
+        
+@pytest.mark.asyncio
+async def test_multi_search_returns_results_in_query_order():
+    delays = {"slow": 0.06, "a": 0.03, "fast": 0.0}
+    fws = FastWebSearch(_DelayedEngine(delays), rate_limit=100)
+    results = await fws.multi_search(list(delays))
+    assert list(results) == ["slow", "a", "fast"]
+    assert results["a"] == ["a"]
+    
+@pytest.mark.asyncio
+async def test_multi_search_stream_yields_in_completion_order():
+    delays = {"slow": 0.06, "a": 0.03, "fast": 0.0}
+    fws = FastWebSearch(_DelayedEngine(delays), rate_limit=100)
+    queries = [query async for query, _ in fws.multi_search_stream(list(delays))]
+    assert queries == ["fast", "a", "slow"]
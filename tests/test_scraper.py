@@ -0,0 +1,189 @@
+"""
+Tests for the scraping helpers, run against local aiohttp servers
+"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import ClientSession, web
+from fastwebsearch import scraper
+from fastwebsearch.models import Proxy
+from fastwebsearch.proxies import ProxyManager
+
+async def _serve(handler):
+    """Start a server routing every path to handler; returns (runner, base_url)"""
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}"
+    
+def _forwarding_proxy(seen):
+    """Plain-HTTP forward proxy that records the absolute URLs it is asked for"""
+    async def handler(request):
+        seen.append(str(request.url))
+        async with ClientSession() as session:
+            async with session.get(str(request.url)) as response:
+                return web.Response(
+                    body=await response.read(),
+                    status=response.status,
+                    content_type=response.content_type
+                )
+    return handler
+    
+@pytest.fixture(autouse=True)
+def _clear_robots_cache():
+    scraper._robot_parsers.clear()
+    yield
+    scraper._robot_parsers.clear()
+    
+@pytest_asyncio.fixture
+async def session():
+    async with ClientSession() as session:
+        yield session
+        
+@pytest.mark.asyncio
+async def test_robots_txt_is_fetched_through_proxy(session):
+    async def target(request):
+        if request.path == "/robots.txt":
+            return web.Response(text="User-agent: *\nDisallow: /private\n")
+        return web.Response(text="ok")
+        
+    via_proxy = []
+    target_runner, target_url = await _serve(target)
+    proxy_runner, proxy_url = await _serve(_forwarding_proxy(via_proxy))
+    try:
+        assert not await scraper.allowed_by_robots_async(
+            session, f"{target_url}/private", proxy_url=proxy_url
+        )
+        assert via_proxy == [f"{target_url}/robots.txt"]
+    finally:
+        await proxy_runner.cleanup()
+        await target_runner.cleanup()
+        
+@pytest.mark.asyncio
+async def test_robots_txt_body_is_capped(session):
+    # A rule placed past the size cap is never seen, so the URL stays allowed
+    padding = "# filler\n" * (scraper._ROBOTS_MAX_BYTES // 9 + 1)
+    
+    async def target(request):
+        return web.Response(text=f"User-agent: *\n{padding}Disallow: /\n")
+        
+    runner, base_url = await _serve(target)
+    try:
+        assert await scraper.allowed_by_robots_async(session, f"{base_url}/page")
+    finally:
+        await runner.cleanup()
+
+async def _serve_raw(headers, body):
+    """Start a bare HTTP server answering every request with the given headers and body"""
+    async def handle(reader, writer):
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        head = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(
+            f"HTTP/1.1 200 OK\r\n{head}Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+        writer.close()
+        
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    return server, f"http://{host}:{port}"
+    
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers, body, expected", [
+    ({"Content-Type": "Text/HTML"}, b"<p>upper</p>", "<p>upper</p>"),
+    ({}, b"<p>no header</p>", "<p>no header</p>"),
+    ({"Content-Type": "text/html; charset=bogus-9"}, b"<p>charset</p>", "<p>charset</p>"),
+])
+async def test_fetch_reads_textual_responses(session, headers, body, expected):
+    server, base_url = await _serve_raw(headers, body)
+    try:
+        result = await scraper.fetch(session, f"{base_url}/page", max_retries=1)
+    finally:
+        server.close()
+    assert result.error is None
+    assert result.content == expected
+    
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content_type", ["application/octet-stream", "image/png"])
+async def test_fetch_rejects_declared_binary_responses(session, content_type):
+    server, base_url = await _serve_raw({"Content-Type": content_type}, b"\x89PNG\x00")
+    try:
+        result = await scraper.fetch(session, f"{base_url}/page", max_retries=1)
+    finally:
+        server.close()
+    assert result.content == ""
+    assert result.error == f"Unsupported content type: {content_type}"
+    
+async def _hung_proxy():
+    """Start a proxy that accepts connections and never answers"""
+    async def handle(reader, writer):
+        await reader.read()
+        
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+    
+def _status_proxy(status):
+    """Plain-HTTP proxy that answers every request with the given error status"""
+    async def handler(request):
+        return web.Response(status=status)
+    return handler
+    
+async def _fetch_via_bad_proxy(session, bad_port, target_url, healthy_url):
+    """Fetch target_url with a previously good but now bad proxy ranked first"""
+    healthy_port = int(healthy_url.rsplit(":", 1)[1])
+    bad = Proxy(host="127.0.0.1", port=bad_port, protocol="http")
+    healthy = Proxy(host="127.0.0.1", port=healthy_port, protocol="http")
+    manager = ProxyManager([bad, healthy])
+    await manager.mark_proxy_success(bad, 0.01)
+    # Skip robots.txt so only the page fetch goes through the proxies
+    scraper._store_robot_parser(target_url, None)
+    try:
+        result = await scraper.fetch(session, f"{target_url}/page", manager, max_retries=2, timeout=0.5)
+    finally:
+        await manager.aclose()
+    return result, manager.proxy_stats[bad.id]
+    
+@pytest.mark.asyncio
+async def test_fetch_counts_hung_proxy_as_failed(session):
+    async def target(request):
+        return web.Response(text="ok")
+        
+    target_runner, target_url = await _serve(target)
+    healthy_runner, healthy_url = await _serve(_forwarding_proxy([]))
+    hung, hung_port = await _hung_proxy()
+    try:
+        result, stats = await _fetch_via_bad_proxy(session, hung_port, target_url, healthy_url)
+    finally:
+        hung.close()
+        await healthy_runner.cleanup()
+        await target_runner.cleanup()
+    assert result.error is None
+    assert result.content == "ok"
+    assert (stats.success_count, stats.fail_count) == (1, 1)
+    
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [407, 502])
+async def test_fetch_counts_proxy_error_status_as_failed(session, status):
+    async def target(request):
+        return web.Response(text="ok")
+        
+    target_runner, target_url = await _serve(target)
+    healthy_runner, healthy_url = await _serve(_forwarding_proxy([]))
+    bad_runner, bad_url = await _serve(_status_proxy(status))
+    bad_port = int(bad_url.rsplit(":", 1)[1])
+    try:
+        result, stats = await _fetch_via_bad_proxy(session, bad_port, target_url, healthy_url)
+    finally:
+        await bad_runner.cleanup()
+        await healthy_runner.cleanup()
+        await target_runner.cleanup()
+    assert result.error is None
+    assert result.content == "ok"
+    assert (stats.success_count, stats.fail_count) == (1, 1)
@@ -0,0 +1,126 @@
+"""
+Tests for the async helpers in fastwebsearch.utils
+"""
+
+import asyncio
+import pytest
+from fastwebsearch.utils import bounded_as_completed, bounded_gather
+
+class _Tracker:
+    """Counts how many jobs run at once"""
+    
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.cancelled = 0
+        
+    async def job(self, value, delay=0.01):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(delay)
+            return value
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.running -= 1
+
+@pytest.mark.asyncio
+async def test_bounded_gather_preserves_input_order():
+    tracker = _Tracker()
+    delays = [0.05, 0.01, 0.03, 0.0, 0.02]
+    results = await bounded_gather(
+        (tracker.job(i, d) for i, d in enumerate(delays)),
+        limit=3
+    )
+    assert results == list(range(len(delays)))
+    
+@pytest.mark.asyncio
+async def test_bounded_gather_respects_limit():
+    tracker = _Tracker()
+    results = await bounded_gather((tracker.job(i) for i in range(20)), limit=4)
+    assert results == list(range(20))
+    assert tracker.peak == 4
+    
+@pytest.mark.asyncio
+async def test_bounded_gather_empty_input():
+    assert await bounded_gather([], limit=3) == []
+    
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [0, -1])
+async def test_bounded_gather_rejects_non_positive_limit(limit):
+    with pytest.raises(ValueError):
+        await bounded_gather([], limit=limit)
+        
+@pytest.mark.asyncio
+async def test_bounded_gather_error_cancels_in_flight_tasks():
+    tracker = _Tracker()
+    
+    async def fail():
+        raise RuntimeError("boom")
+        
+    jobs = [fail()] + [tracker.job(i, delay=1) for i in range(3)]
+    with pytest.raises(RuntimeError, match="boom"):
+        await bounded_gather(jobs, limit=4)
+    await asyncio.sleep(0)
+    assert tracker.running == 0
+    assert tracker.cancelled == 3
+    
+@pytest.mark.asyncio
+async def test_bounded_gather_caller_cancellation_cancels_in_flight_tasks():
+    tracker = _Tracker()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(
+            bounded_gather((tracker.job(i, delay=1) for i in range(10)), limit=5),
+            0.05
+        )
+    await asyncio.sleep(0)
+    assert tracker.running == 0
+    assert tracker.cancelled == 5
+
+@pytest.mark.asyncio
+async def test_bounded_as_completed_yields_in_completion_order():
+    tracker = _Tracker()
+    delays = {"slow": 0.06, "medium": 0.03, "fast": 0.0}
+    pairs = [
+        key async for key, _ in bounded_as_completed(
+            ((key, tracker.job(key, d)) for key, d in delays.items()),
+            limit=3
+        )
+    ]
+    assert pairs == ["fast", "medium", "slow"]
+    
+@pytest.mark.asyncio
+async def test_bounded_as_completed_returns_every_result():
+    tracker = _Tracker()
+    results = dict([
+        pair async for pair in bounded_as_completed(
+            ((i, tracker.job(i * 2)) for i in range(10)),
+            limit=3
+        )
+    ])
+    assert results == {i: i * 2 for i in range(10)}
+    assert tracker.peak == 3
+    
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [0, -1])
+async def test_bounded_as_completed_rejects_non_positive_limit(limit):
+    with pytest.raises(ValueError):
+        async for _ in bounded_as_completed([], limit=limit):
+            pass
+            
+@pytest.mark.asyncio
+async def test_bounded_as_completed_early_exit_cancels_in_flight_tasks():
+    tracker = _Tracker()
+    stream = bounded_as_completed(
+        ((i, tracker.job(i, delay=0 if i == 0 else 1)) for i in range(10)),
+        limit=4
+    )
+    async for key, _ in stream:
+        assert key == 0
+        break
+    await stream.aclose()
+    await asyncio.sleep(0)
+    assert tracker.running == 0
+    assert tracker.cancelled == 3